@@ -1,11 +1,11 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-BASELINE="data/processed/current_baseline.csv"
-CURRENT="data/processed/current.csv"
+BASELINE="data/processed/current_baseline.parquet"
+CURRENT="data/processed/current.parquet"
 
 if [[ ! -f "$CURRENT" ]]; then
-  echo "Error: $CURRENT not found. Run 'make data-prep' (or ensure data/processed/current.csv exists) first." >&2
+  echo "Error: $CURRENT not found. Run 'make data-prep' (or ensure data/processed/current.parquet exists) first." >&2
   exit 1
 fi
 
@@ -18,12 +18,12 @@ cp "$BASELINE" "$CURRENT"
 echo "== injecting drift =="
 python - <<'PY'
 import pandas as pd
-df = pd.read_csv("data/processed/current.csv")
+df = pd.read_parquet("data/processed/current.parquet")
 if "distance" in df.columns:
     df["distance"] = df["distance"] * 1.8
 if "dep_hour" in df.columns:
     df["dep_hour"] = (df["dep_hour"] + 6).clip(0, 23)
-df.to_csv("data/processed/current.csv", index=False)
+df.to_parquet("data/processed/current.parquet", index=False)
 print("Drift injected. Rows:", len(df))
 PY
 
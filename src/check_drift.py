@@ -4,13 +4,14 @@ import json
 import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-from data_preprocessing import load_data
+from data_preprocessing import load_data, load_schema
 from drift import detect_drift
 
-REFERENCE_PATH = Path("data/processed/reference.csv")
-CURRENT_PATH = Path("data/processed/current.csv")
+REFERENCE_PATH = Path("data/processed/reference.parquet")
+CURRENT_PATH = Path("data/processed/current.parquet")
 PSI_RETRAIN_THRESHOLD = 0.25
 
 
@@ -26,17 +27,18 @@ def main() -> int:
         print("[ERROR] Current file not found:", CURRENT_PATH)
         return 1
 
+    # Numeric columns come from the Parquet schemas, so only those are ever read
     try:
-        reference_df = load_data(REFERENCE_PATH)
-        current_df = load_data(CURRENT_PATH)
+        reference_dtypes = load_schema(REFERENCE_PATH)
+        current_cols = set(load_schema(CURRENT_PATH).index)
     except Exception as e:
-        print("[ERROR] Failed to load data:", e)
+        print("[ERROR] Failed to read schema:", e)
         return 1
 
     numeric_cols = [
-        c for c in reference_df.columns
-        if pd.api.types.is_numeric_dtype(reference_df[c])
-        and c in current_df.columns
+        c for c, dtype in reference_dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype)
+        and c in current_cols
     ]
     if not numeric_cols:
         print("[WARN] No numeric columns in common; nothing to check.")
@@ -44,11 +46,19 @@ def main() -> int:
         print(json.dumps(report, indent=2))
         return 0
 
+    try:
+        reference_df = load_data(REFERENCE_PATH, columns=numeric_cols, dtype_backend="pyarrow")
+        current_df = load_data(CURRENT_PATH, columns=numeric_cols, dtype_backend="pyarrow")
+    except Exception as e:
+        print("[ERROR] Failed to load data:", e)
+        return 1
+
     print("  Numeric columns:", len(numeric_cols))
 
     per_feature = detect_drift(reference_df, current_df, numeric_cols)
-    psi_values = [m["psi"] for m in per_feature.values() if not (m["psi"] != m["psi"])]
-    max_psi = max(psi_values) if psi_values else None
+    psi_arr = np.fromiter((m["psi"] for m in per_feature.values()), dtype=float, count=len(per_feature))
+    psi_arr = psi_arr[~np.isnan(psi_arr)]
+    max_psi = float(psi_arr.max()) if psi_arr.size else None
 
     report = {
         "max_psi": max_psi,
@@ -1,14 +1,25 @@
-"""Download flights_sample_3m.csv from Kaggle dataset via CLI."""
+"""Download flights_sample_3m.csv from the Kaggle dataset via the Kaggle Python API."""
 
 import argparse
 import shutil
-import subprocess
 import zipfile
 from pathlib import Path
 
 DATASET = "patrickzel/flight-delay-and-cancellation-dataset-2019-2023"
 FILE_NAME = "flights_sample_3m.csv"
 DEFAULT_OUTPUT_DIR = "data/raw"
+# Buffer for streaming the CSV out of the zip
+COPY_BUFFER_SIZE = 1 << 20
+
+
+def _extract_member(zip_path: Path, target: Path) -> None:
+    """Stream FILE_NAME out of zip_path straight to target (no extract-then-move)."""
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        name = next((n for n in zf.namelist() if n.endswith(FILE_NAME)), None)
+        if name is None:
+            raise FileNotFoundError(f"{FILE_NAME} not found in {zip_path}")
+        with zf.open(name) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, length=COPY_BUFFER_SIZE)
 
 
 def main() -> None:
@@ -24,30 +35,17 @@ def main() -> None:
     out_dir = Path(args.output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    cmd = [
-        "kaggle", "datasets", "download",
-        "-d", DATASET,
-        "-f", FILE_NAME,
-        "-p", str(out_dir),
-    ]
-    print("Running:", " ".join(cmd))
-    result = subprocess.run(cmd, check=False)
-    if result.returncode != 0:
-        raise SystemExit(result.returncode)
-
-    # Kaggle downloads a zip; extract the CSV into the output dir if present
-    zips = list(out_dir.glob("*.zip"))
-    if zips:
-        target = out_dir / FILE_NAME
-        with zipfile.ZipFile(zips[0], "r") as zf:
-            for name in zf.namelist():
-                if name.endswith(FILE_NAME) or name == FILE_NAME:
-                    zf.extract(name, out_dir)
-                    extracted = out_dir / name
-                    if extracted.resolve() != target.resolve():
-                        shutil.move(str(extracted), str(target))
-                    break
-        zips[0].unlink(missing_ok=True)
+    # Imported here: importing kaggle authenticates (~/.kaggle/kaggle.json or KAGGLE_* env vars)
+    from kaggle import api
+
+    print(f"Downloading {DATASET}/{FILE_NAME} -> {out_dir}")
+    api.dataset_download_file(DATASET, FILE_NAME, path=str(out_dir), force=False, quiet=True)
+
+    # Kaggle may deliver the file zipped; stream the CSV out of it and drop the archive
+    zip_path = out_dir / f"{FILE_NAME}.zip"
+    if zip_path.exists():
+        _extract_member(zip_path, out_dir / FILE_NAME)
+        zip_path.unlink()
 
 
 if __name__ == "__main__":
@@ -1,9 +1,16 @@
-"""Preprocess flight delay CSV: load largest from data/raw, add year/target/features, split into reference and current."""
+"""Preprocess flight delay CSV: load largest from data/raw, add year/target/features, split into reference and current Parquet files."""
 
 import argparse
+import gc
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+# Arrow CSV block size: large blocks keep per-batch overhead low on multi-GB inputs
+CSV_BLOCK_SIZE = 64 << 20
 
 # Column name candidates (first match wins)
 DATE_CANDIDATES = ["FL_DATE", "Flight_Date", "flight_date"]
@@ -32,6 +39,26 @@ def _largest_csv(raw_dir: Path) -> Path:
     return max(csvs, key=lambda p: p.stat().st_size)
 
 
+def _read_csv_columns(path: Path, columns: list[str], max_rows: int | None) -> pd.DataFrame:
+    """Stream the CSV with PyArrow, materializing only `columns` and stopping after max_rows."""
+    read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+    convert_options = pacsv.ConvertOptions(include_columns=columns)
+    if max_rows is None:
+        table = pacsv.read_csv(path, read_options=read_options, convert_options=convert_options)
+        return table.to_pandas()
+
+    batches = []
+    n_rows = 0
+    with pacsv.open_csv(path, read_options=read_options, convert_options=convert_options) as reader:
+        for batch in reader:
+            batches.append(batch)
+            n_rows += batch.num_rows
+            if n_rows >= max_rows:
+                break
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+    return table.slice(0, max_rows).to_pandas()
+
+
 def _extract_year(df: pd.DataFrame, date_col: str | None, year_col: str | None, month_col: str | None, day_col: str | None) -> pd.Series:
     if year_col and year_col in df.columns:
         return df[year_col].astype(int)
@@ -46,17 +73,19 @@ def _extract_year(df: pd.DataFrame, date_col: str | None, year_col: str | None,
 
 def _extract_dep_hour(df: pd.DataFrame, dep_time_col: str) -> pd.Series:
     # BTS style: DEP_TIME as HHMM (e.g. 830 = 8:30) or minutes since midnight
-    raw = pd.to_numeric(df[dep_time_col], errors="coerce")
-    # If values > 2400 or very large, treat as minutes; else HHMM
-    if raw.max() > 2400 or raw.min() > 2400:
-        return (raw // 60).astype("Int64")
-    return (raw // 100).astype("Int64")
+    raw = pd.to_numeric(df[dep_time_col], errors="coerce").to_numpy(dtype=np.float32)
+    # If values > 2400 or very large, treat as minutes; else HHMM (a single max scan decides)
+    # (fmax ignores NaN, so all-NaN or empty input falls through to HHMM without a warning)
+    divisor = 60 if np.fmax.reduce(raw, initial=-np.inf) > 2400 else 100
+    hours = np.floor_divide(raw, divisor)
+    # Hours fit in int16; NaN becomes <NA>
+    return pd.Series(pd.array(hours, dtype="Int16"), index=df.index)
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Preprocess flight delay CSV and split into reference/current.")
     parser.add_argument("--raw-dir", type=str, default="data/raw", help="Directory containing raw CSV(s)")
-    parser.add_argument("--out-dir", type=str, default="data/processed", help="Output directory for reference.csv and current.csv")
+    parser.add_argument("--out-dir", type=str, default="data/processed", help="Output directory for reference.parquet and current.parquet")
     parser.add_argument("--reference-year", type=int, default=2021, help="Year for reference set")
     parser.add_argument("--current-year", type=int, default=2022, help="Year for current set")
     parser.add_argument("--max-rows", type=int, default=None, help="Max rows to read (default: all)")
@@ -71,9 +100,7 @@ def main() -> None:
 
     path = _largest_csv(raw_dir)
     print(f"Loading largest CSV: {path} ({path.stat().st_size / 1e6:.1f} MB)")
-    df = pd.read_csv(path, nrows=args.max_rows)
-    print(f"Loaded shape: {df.shape}")
-    cols = list(df.columns)
+    cols = list(pd.read_csv(path, nrows=0).columns)
 
     date_col = _pick(cols, DATE_CANDIDATES)
     year_col = _pick(cols, YEAR_COL_CANDIDATES)
@@ -86,6 +113,16 @@ def main() -> None:
     distance_col = _pick(cols, DISTANCE_CANDIDATES)
     dep_time_col = _pick(cols, DEP_TIME_CANDIDATES)
 
+    # Only the picked columns are parsed; everything else in the raw file is skipped
+    needed = [
+        c
+        for c in (date_col, year_col, month_col, day_col, arr_delay_col, airline_col,
+                  origin_col, dest_col, distance_col, dep_time_col)
+        if c
+    ]
+    df = _read_csv_columns(path, needed, args.max_rows)
+    print(f"Loaded shape: {df.shape}")
+
     df["year"] = _extract_year(df, date_col, year_col, month_col, day_col)
     year_min, year_max = int(df["year"].min()), int(df["year"].max())
     print(f"Detected year range: {year_min}–{year_max}")
@@ -115,17 +152,27 @@ def main() -> None:
         keep.discard(dep_time_col)
 
     existing = [c for c in keep if c in df.columns]
-    out = df[existing].copy()
+    # Column selection copies once; the raw frame is released before anything else is built and the
+    # rename is done in place (labels only), so at most the raw frame plus one copy are alive
+    out = df.loc[:, existing]
+    del df
     out.rename(columns=renames, inplace=True)
     out = out.dropna(how="all", axis=1)
 
+    ref_path = out_dir / "reference.parquet"
+    cur_path = out_dir / "current.parquet"
+
+    # Write one split at a time and release it before building the next to keep peak RAM low
     ref = out[out["year"] == args.reference_year].drop(columns=["year"])
-    cur = out[out["year"] == args.current_year].drop(columns=["year"])
-    ref_path = out_dir / "reference.csv"
-    cur_path = out_dir / "current.csv"
-    ref.to_csv(ref_path, index=False)
-    cur.to_csv(cur_path, index=False)
+    ref.to_parquet(ref_path, index=False, compression="zstd")
     print(f"Reference ({args.reference_year}): {ref.shape} -> {ref_path}")
+    del ref
+    gc.collect()
+
+    cur = out[out["year"] == args.current_year].drop(columns=["year"])
+    del out
+    gc.collect()
+    cur.to_parquet(cur_path, index=False, compression="zstd")
     print(f"Current   ({args.current_year}): {cur.shape} -> {cur_path}")
 
 
@@ -1,5 +1,6 @@
 """Data loading and preprocessor construction for the training pipeline."""
 
+from collections.abc import Iterator
 from pathlib import Path
 
 import pandas as pd
@@ -9,20 +10,76 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
 
-def load_data(path: str | Path) -> pd.DataFrame:
-    """Load a dataset from disk. Supports .csv and .parquet."""
+def load_data(
+    path: str | Path,
+    columns: list[str] | None = None,
+    dtype_backend: str | None = None,
+    **read_kwargs,
+) -> pd.DataFrame:
+    """
+    Load a dataset from disk. Supports .csv and .parquet.
+    columns limits what is parsed/decoded; dtype_backend="pyarrow" keeps Arrow buffers
+    (zero-copy from Parquet) instead of converting to NumPy dtypes. Extra keyword arguments
+    go to the reader (e.g. dtype= for CSV to skip type inference).
+    """
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Data file not found: {path}")
 
+    backend = {"dtype_backend": dtype_backend} if dtype_backend else {}
     suffix = path.suffix.lower()
     if suffix == ".csv":
-        return pd.read_csv(path)
+        # Arrow's multithreaded parser; read_kwargs must be options the pyarrow engine supports
+        return pd.read_csv(path, engine="pyarrow", usecols=columns, **backend, **read_kwargs)
     if suffix == ".parquet":
-        return pd.read_parquet(path)
+        return pd.read_parquet(path, engine="pyarrow", columns=columns, **backend, **read_kwargs)
     raise ValueError(f"Unsupported format: {suffix}. Use .csv or .parquet.")
 
 
+def load_schema(path: str | Path) -> pd.Series:
+    """Column dtypes of a .parquet file, read from its footer without decoding any data."""
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Data file not found: {path}")
+    if path.suffix.lower() != ".parquet":
+        raise ValueError(f"Schema-only read needs .parquet, got: {path.suffix.lower()}")
+    return pq.read_schema(path).empty_table().to_pandas().dtypes
+
+
+def iter_data(
+    path: str | Path,
+    columns: list[str] | None = None,
+    chunksize: int = 100_000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a .csv or .parquet file as DataFrames of at most chunksize rows, decoding only `columns`.
+    Always yields at least one (possibly empty) frame so callers see the column dtypes.
+    """
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Data file not found: {path}")
+
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with pd.read_csv(path, usecols=columns, chunksize=chunksize) as reader:
+            yield from reader
+        return
+    if suffix != ".parquet":
+        raise ValueError(f"Unsupported format: {suffix}. Use .csv or .parquet.")
+
+    parquet_file = pq.ParquetFile(path)
+    empty = True
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        empty = False
+        yield batch.to_pandas()
+    if empty:
+        yield parquet_file.schema_arrow.empty_table().select(parquet_file.schema_arrow.names if columns is None else columns).to_pandas()
+
+
 def build_preprocessor(
     numeric_features: list[str],
     categorical_features: list[str],
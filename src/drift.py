@@ -5,93 +5,206 @@ from typing import Any
 
 import numpy as np
 import pandas as pd
-from scipy.stats import ks_2samp
+from joblib import Parallel, delayed
+
+# Sibling import that works both as src.drift (package) and as drift (CLI scripts run from src/)
+try:
+    from .drift_numba import psi_batch, psi_from_counts
+except ImportError:
+    from drift_numba import psi_batch, psi_from_counts
 
 
 # Minimum proportion per bin to avoid log(0); keep PSI finite
 _EPS = 1e-10
+_PSI_BUCKETS = 10
+# Wide tables go through the compiled batch kernel (when numba is installed)
+_PSI_BATCH_MIN_FEATURES = 4
+
+
+def _as_float_array(values: np.ndarray | pd.Series) -> np.ndarray:
+    """float32/float64 ndarrays pass through as-is (no float64 copy of float32 data); others become float64."""
+    if isinstance(values, np.ndarray) and values.dtype in (np.float32, np.float64):
+        return values
+    return np.asarray(values, dtype=float)
+
+
+def _bin_counts(values: np.ndarray, lo: float, scale: float, buckets: int) -> np.ndarray:
+    """Equal-width bin counts starting at lo; values outside the range land in the edge bins."""
+    idx = np.clip((values - lo) * scale, 0, buckets - 1).astype(np.intp)
+    return np.bincount(idx, minlength=buckets)
+
+
+def _psi_numpy(
+    expected: np.ndarray,
+    actual: np.ndarray,
+    lo: float,
+    hi: float,
+    buckets: int = _PSI_BUCKETS,
+) -> float:
+    """PSI core on NaN-free, non-empty arrays; lo/hi are the expected min/max (e.g. sorted ends)."""
+    # Constant expected: single bin at that value
+    if hi == lo:
+        in_bin = int(np.count_nonzero(np.abs(actual - lo) <= _EPS))
+        a = max(_EPS, min(in_bin / len(actual), 1.0))
+        return (a - 1.0) * math.log(a)
+
+    # Uniform edges over the expected range: bin index is arithmetic, counts via bincount
+    scale = buckets / (hi - lo)
+    expected_counts = _bin_counts(expected, lo, scale, buckets)
+    actual_counts = _bin_counts(actual, lo, scale, buckets)
+
+    # PSI = sum((actual_pct - expected_pct) * ln(actual_pct / expected_pct)), fused into one
+    # pass over the buckets: proportion, clip to _EPS, log-ratio and sum without temporaries
+    if psi_from_counts is not None:
+        return float(psi_from_counts(expected_counts, actual_counts, len(expected), len(actual)))
+    n_expected = len(expected)
+    n_actual = len(actual)
+    psi_val = 0.0
+    for e_count, a_count in zip(expected_counts.tolist(), actual_counts.tolist()):
+        e = max(e_count / n_expected, _EPS)
+        a = max(a_count / n_actual, _EPS)
+        psi_val += (a - e) * math.log(a / e)
+    return psi_val
+
+
+# Compiled kernel with the same contract when built (make build-ext); NumPy otherwise
+try:
+    from .drift_cy import psi_edges as _psi_kernel
+except ImportError:
+    try:
+        from drift_cy import psi_edges as _psi_kernel
+    except ImportError:
+        _psi_kernel = _psi_numpy
 
 
 def psi(
     expected: np.ndarray | pd.Series,
     actual: np.ndarray | pd.Series,
-    buckets: int = 10,
+    buckets: int = _PSI_BUCKETS,
 ) -> float:
     """
     Population Stability Index between expected and actual distributions.
     Robust to constant arrays and NaNs (NaNs dropped; constant arrays yield 0 or finite PSI).
     """
-    expected = np.asarray(expected, dtype=float)
-    actual = np.asarray(actual, dtype=float)
+    expected = _as_float_array(expected)
+    actual = _as_float_array(actual)
     expected = expected[~np.isnan(expected)]
     actual = actual[~np.isnan(actual)]
 
     if len(expected) == 0 or len(actual) == 0:
         return float("nan")
+    # The compiled kernel needs one float dtype for both sides
+    dtype = np.result_type(expected, actual)
+    expected = expected.astype(dtype, copy=False)
+    actual = actual.astype(dtype, copy=False)
+    return _psi_kernel(expected, actual, float(np.min(expected)), float(np.max(expected)), buckets)
 
-    # Constant expected: single bin at that value
-    if np.ptp(expected) == 0:
-        c = float(np.min(expected))
-        expected_pct = np.array([1.0])
-        in_bin = np.sum(np.abs(actual - c) <= _EPS) if len(actual) > 0 else 0
-        p = in_bin / len(actual)
-        actual_pct = np.array([max(_EPS, min(p, 1.0))])
-    else:
-        _, bin_edges = np.histogram(expected, bins=buckets)
-        if np.ptp(bin_edges) == 0:
-            expected_pct = np.array([1.0])
-            actual_pct = np.array([1.0])
-        else:
-            expected_counts, _ = np.histogram(expected, bins=bin_edges)
-            actual_counts, _ = np.histogram(actual, bins=bin_edges)
-            expected_pct = expected_counts / max(expected_counts.sum(), 1)
-            actual_pct = actual_counts / max(actual_counts.sum(), 1)
-            expected_pct = np.clip(expected_pct, _EPS, 1.0)
-            actual_pct = np.clip(actual_pct, _EPS, 1.0)
-
-    # PSI = sum((actual_pct - expected_pct) * ln(actual_pct / expected_pct))
-    ratio = np.clip(actual_pct / expected_pct, _EPS, 1.0 / _EPS)
-    psi_val = np.sum((actual_pct - expected_pct) * np.log(ratio))
-    return float(psi_val)
+
+def _ks_pvalue(stat: float, n_expected: int, n_actual: int) -> float:
+    """Two-sided asymptotic KS p-value (Smirnov), as in ks_2samp(method="asymp")."""
+    from scipy.stats import kstwo
+
+    en = n_expected * n_actual / (n_expected + n_actual)
+    return float(kstwo.sf(stat, max(round(en), 1)))
+
+
+def _ks_sorted(
+    expected: np.ndarray,
+    actual: np.ndarray,
+    pvalue: bool = True,
+) -> tuple[float, float]:
+    """KS core on sorted, NaN-free, non-empty arrays."""
+    # Both empirical CDFs evaluated at every observed value; KS stat is their max gap
+    both = np.concatenate([expected, actual])
+    cdf_expected = np.searchsorted(expected, both, side="right") / len(expected)
+    cdf_actual = np.searchsorted(actual, both, side="right") / len(actual)
+    stat = float(np.max(np.abs(cdf_expected - cdf_actual)))
+    if not pvalue:
+        return stat, float("nan")
+    return stat, _ks_pvalue(stat, len(expected), len(actual))
 
 
 def ks_test(
     expected: np.ndarray | pd.Series,
     actual: np.ndarray | pd.Series,
+    pvalue: bool = True,
 ) -> tuple[float, float]:
     """
     Two-sample Kolmogorov–Smirnov test. Returns (statistic, p-value).
-    NaNs are dropped from both samples.
+    NaNs are dropped from both samples. The statistic is computed with NumPy
+    (sort + searchsorted); the p-value is only computed when pvalue=True, else NaN.
     """
-    expected = np.asarray(expected, dtype=float)
-    actual = np.asarray(actual, dtype=float)
+    expected = _as_float_array(expected)
+    actual = _as_float_array(actual)
     expected = expected[~np.isnan(expected)]
     actual = actual[~np.isnan(actual)]
 
     if len(expected) == 0 or len(actual) == 0:
         return float("nan"), float("nan")
+    return _ks_sorted(np.sort(expected), np.sort(actual), pvalue)
 
-    stat, pvalue = ks_2samp(expected, actual)
-    return float(stat), float(pvalue)
+
+def _one_col(
+    ref: np.ndarray,
+    cur: np.ndarray,
+    batch_psi: float | None = None,
+) -> tuple[float, float, float]:
+    """(psi, ks_stat, ks_pvalue) for one feature; batch_psi, if given, is the precomputed PSI."""
+    # Clean and sort each side once: sorted ends give the PSI range, KS reuses the order
+    ref = np.sort(ref[~np.isnan(ref)])
+    cur = np.sort(cur[~np.isnan(cur)])
+    if len(ref) == 0 or len(cur) == 0:
+        return float("nan"), float("nan"), float("nan")
+    if batch_psi is not None:
+        psi_val = batch_psi
+    else:
+        psi_val = _psi_kernel(ref, cur, float(ref[0]), float(ref[-1]))
+    ks_stat, ks_pvalue = _ks_sorted(ref, cur)
+    return psi_val, ks_stat, ks_pvalue
+
+
+def _feature_dtype(*frames: pd.DataFrame) -> type[np.floating]:
+    """float32 only when every column converts to it losslessly (e.g. float32, small ints); float64 otherwise."""
+    for df in frames:
+        for dtype in df.dtypes:
+            np_dtype = getattr(dtype, "numpy_dtype", dtype)  # nullable and Arrow dtypes
+            if not isinstance(np_dtype, np.dtype) or not np.can_cast(np_dtype, np.float32, casting="safe"):
+                return np.float64
+    return np.float32
 
 
 def detect_drift(
     reference_df: pd.DataFrame,
     current_df: pd.DataFrame,
     numeric_cols: list[str],
+    n_jobs: int = -1,
 ) -> dict[str, dict[str, Any]]:
     """
     Compute drift metrics per numeric feature.
     Returns dict[feature_name, {"psi": float, "ks_stat": float, "ks_pvalue": float}].
+    Features are processed on a thread pool of n_jobs workers (NumPy releases the GIL in the sorts and scans).
     """
+    cols = [c for c in numeric_cols if c in reference_df.columns and c in current_df.columns]
     results: dict[str, dict[str, Any]] = {}
-    for col in numeric_cols:
-        if col not in reference_df.columns or col not in current_df.columns:
-            continue
-        ref = reference_df[col]
-        cur = current_df[col]
-        psi_val = psi(ref, cur)
-        ks_stat, ks_pvalue = ks_test(ref, cur)
+    if not cols:
+        return results
+
+    # Materialize all features once, feature-major (one contiguous row per column). float32 halves the
+    # footprint but is only used when lossless: large magnitudes (e.g. epoch timestamps) collapse in it
+    reference_df = reference_df[cols]
+    current_df = current_df[cols]
+    dtype = _feature_dtype(reference_df, current_df)
+    ref_np = np.ascontiguousarray(reference_df.to_numpy(dtype=dtype, na_value=np.nan).T)
+    cur_np = np.ascontiguousarray(current_df.to_numpy(dtype=dtype, na_value=np.nan).T)
+    batch_psi = None
+    if psi_batch is not None and len(cols) > _PSI_BATCH_MIN_FEATURES:
+        batch_psi = psi_batch(ref_np, cur_np, _PSI_BUCKETS)
+
+    per_col = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_one_col)(ref_np[j], cur_np[j], float(batch_psi[j]) if batch_psi is not None else None)
+        for j in range(len(cols))
+    )
+    for col, (psi_val, ks_stat, ks_pvalue) in zip(cols, per_col):
         results[col] = {
             "psi": psi_val,
             "ks_stat": ks_stat,
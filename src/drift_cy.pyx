@@ -0,0 +1,52 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# distutils: extra_compile_args = -O3 -ffast-math
+"""Cython PSI kernel (optional; build with `make build-ext`). Same contract as drift._psi_numpy."""
+
+from cython cimport floating
+from libc.math cimport fabs, log
+from libc.stdlib cimport calloc, free
+
+# Must match drift._EPS so both paths produce the same PSI
+cdef double _EPS = 1e-10
+
+
+def psi_edges(floating[::1] expected, floating[::1] actual, double lo, double hi, int buckets=10):
+    """PSI on NaN-free, non-empty arrays; lo/hi are the expected min/max."""
+    cdef Py_ssize_t n_e = expected.shape[0]
+    cdef Py_ssize_t n_a = actual.shape[0]
+    cdef Py_ssize_t i, in_bin = 0
+    cdef int b
+    cdef double scale, x, e, a, total = 0.0
+    cdef Py_ssize_t *e_counts
+    cdef Py_ssize_t *a_counts
+
+    # Constant expected: single bin at that value
+    if hi == lo:
+        for i in range(n_a):
+            if fabs(actual[i] - lo) <= _EPS:
+                in_bin += 1
+        a = max(_EPS, min(<double>in_bin / n_a, 1.0))
+        return (a - 1.0) * log(a)
+
+    scale = buckets / (hi - lo)
+    e_counts = <Py_ssize_t *>calloc(buckets, sizeof(Py_ssize_t))
+    a_counts = <Py_ssize_t *>calloc(buckets, sizeof(Py_ssize_t))
+    if e_counts == NULL or a_counts == NULL:
+        free(e_counts)
+        free(a_counts)
+        raise MemoryError()
+    try:
+        for i in range(n_e):
+            x = min(max((expected[i] - lo) * scale, 0.0), buckets - 1)
+            e_counts[<int>x] += 1
+        for i in range(n_a):
+            x = min(max((actual[i] - lo) * scale, 0.0), buckets - 1)
+            a_counts[<int>x] += 1
+        for b in range(buckets):
+            e = max(<double>e_counts[b] / n_e, _EPS)
+            a = max(<double>a_counts[b] / n_a, _EPS)
+            total += (a - e) * log(a / e)
+    finally:
+        free(e_counts)
+        free(a_counts)
+    return total
@@ -0,0 +1,91 @@
+"""Numba-compiled PSI kernels: every feature column at once, and the per-bucket reduction. None when numba is unavailable."""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - numba is optional
+    njit = None
+
+# Must match drift._EPS so both paths produce the same PSI
+_EPS = 1e-10
+
+# fastmath without "nnan"/"ninf": the kernel relies on NaN checks to drop missing values
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+def _psi_from_counts(e_counts: np.ndarray, a_counts: np.ndarray, n_e: int, n_a: int) -> float:
+    """PSI from per-bucket counts: proportion, clip to _EPS, log-ratio and sum fused in one loop."""
+    total = 0.0
+    for b in range(e_counts.shape[0]):
+        e = max(e_counts[b] / n_e, _EPS)
+        a = max(a_counts[b] / n_a, _EPS)
+        total += (a - e) * math.log(a / e)
+    return total
+
+
+def _psi_batch(ref: np.ndarray, cur: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    PSI per row of ref/cur (feature-major: rows = features, columns = samples), same semantics as drift.psi:
+    NaNs dropped, empty feature -> NaN, constant reference -> single bin, equal-width bins otherwise.
+    """
+    n_features = ref.shape[0]
+    out = np.empty(n_features, dtype=np.float64)
+    for j in prange(n_features):
+        lo = math.inf
+        hi = -math.inf
+        n_e = 0
+        for i in range(ref.shape[1]):
+            v = ref[j, i]
+            if not math.isnan(v):
+                n_e += 1
+                lo = min(lo, v)
+                hi = max(hi, v)
+        n_a = 0
+        for i in range(cur.shape[1]):
+            if not math.isnan(cur[j, i]):
+                n_a += 1
+        if n_e == 0 or n_a == 0:
+            out[j] = math.nan
+            continue
+
+        if hi == lo:
+            in_bin = 0
+            for i in range(cur.shape[1]):
+                if abs(cur[j, i] - lo) <= _EPS:
+                    in_bin += 1
+            a = max(_EPS, min(in_bin / n_a, 1.0))
+            out[j] = (a - 1.0) * math.log(min(max(a, _EPS), 1.0 / _EPS))
+            continue
+
+        scale = buckets / (hi - lo)
+        e_counts = np.zeros(buckets, dtype=np.int64)
+        a_counts = np.zeros(buckets, dtype=np.int64)
+        for i in range(ref.shape[1]):
+            v = ref[j, i]
+            if not math.isnan(v):
+                e_counts[int(min(max((v - lo) * scale, 0.0), buckets - 1))] += 1
+        for i in range(cur.shape[1]):
+            v = cur[j, i]
+            if not math.isnan(v):
+                a_counts[int(min(max((v - lo) * scale, 0.0), buckets - 1))] += 1
+
+        total = 0.0
+        for b in range(buckets):
+            e = max(e_counts[b] / n_e, _EPS)
+            a = max(a_counts[b] / n_a, _EPS)
+            total += (a - e) * math.log(a / e)
+        out[j] = total
+    return out
+
+
+# No on-disk cache: numba keys it by module name, and this file is imported as both drift_numba (CLI scripts
+# run from src/) and src.drift_numba (tests, serve), so a cache written under one name breaks the other
+if njit is not None:
+    psi_batch = njit(parallel=True, fastmath=_FASTMATH)(_psi_batch)
+    psi_from_counts = njit(fastmath=_FASTMATH)(_psi_from_counts)
+else:
+    psi_batch = None
+    psi_from_counts = None
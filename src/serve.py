@@ -3,45 +3,119 @@
 import json
 import logging
 import os
+import threading
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
 import joblib
 import numpy as np
+import orjson
 import pandas as pd
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
+# Shared drift helpers; works both as src.serve (uvicorn src.serve:app) and as a script run from src/
+try:
+    from .drift import _EPS, _bin_counts, _ks_sorted
+except ImportError:
+    from drift import _EPS, _bin_counts, _ks_sorted
+
 logger = logging.getLogger(__name__)
 
 MODEL_PATH = Path("models/model.pkl")
 METADATA_PATH = Path("models/metadata.json")
 PSI_RETRAIN_THRESHOLD = 0.25
-REFERENCE_PATH = Path(os.getenv("DRIFT_REFERENCE_PATH", "data/processed/reference.csv"))
-CURRENT_PATH = Path(os.getenv("DRIFT_CURRENT_PATH", "data/processed/current.csv"))
+REFERENCE_PATH = Path(os.getenv("DRIFT_REFERENCE_PATH", "data/processed/reference.parquet"))
+CURRENT_PATH = Path(os.getenv("DRIFT_CURRENT_PATH", "data/processed/current.parquet"))
 
-# Load model at import time (best-effort; /predict will guard if missing)
-try:
-    model = joblib.load(MODEL_PATH) if MODEL_PATH.exists() else None
-except Exception:  # pragma: no cover - defensive
-    logger.exception("Failed to load model from %s", MODEL_PATH)
-    model = None
 
-# Load feature columns metadata
-feature_cols: list[str] = []
-if METADATA_PATH.exists():
+def _load_feature_cols() -> list[str]:
+    """feature_cols from models/metadata.json; empty if missing or unreadable."""
+    if not METADATA_PATH.exists():
+        return []
     try:
         with open(METADATA_PATH) as f:
             meta = json.load(f)
-        cols = meta.get("feature_cols") or []
-        feature_cols = list(cols)
+        return list(meta.get("feature_cols") or [])
     except Exception:  # pragma: no cover - defensive
         logger.exception("Failed to load feature_cols from %s", METADATA_PATH)
-        feature_cols = []
-else:
-    feature_cols = []
+        return []
+
+
+model = None
+feature_cols: list[str] = []
+# (model.pkl mtime, metadata.json mtime) of the loaded model
+_model_version: tuple[float, float | None] | None = None
+_model_lock = threading.Lock()
+# Structured dtype of one /predict row for the current model and feature_cols (built lazily)
+_row_dtype: np.dtype | None = None
+
+
+def _maybe_reload_model() -> None:
+    """
+    (Re)load the model and feature_cols when models/model.pkl or models/metadata.json has a new mtime.
+    NumPy buffers are memory-mapped (shared page cache across workers); this relies on train.py
+    replacing model.pkl atomically, never rewriting it in place. On a failed load the previous model
+    is kept and the new version recorded, so the next write by a retrain triggers another attempt.
+    """
+    global model, feature_cols, _model_version, _row_dtype
+    try:
+        model_mtime = MODEL_PATH.stat().st_mtime
+    except FileNotFoundError:
+        return
+    try:
+        metadata_mtime = METADATA_PATH.stat().st_mtime
+    except FileNotFoundError:
+        metadata_mtime = None
+    version = (model_mtime, metadata_mtime)
+    if version == _model_version:
+        return
+    with _model_lock:
+        if version == _model_version:
+            return
+        try:
+            model = joblib.load(MODEL_PATH, mmap_mode="r")
+            feature_cols = _load_feature_cols()
+            _row_dtype = None
+        except Exception:  # pragma: no cover - defensive
+            logger.exception("Failed to load model from %s", MODEL_PATH)
+        _model_version = version
+
+
+def _numeric_model_inputs(pipeline) -> set[str]:
+    """Columns routed to the numeric ("num") branch of the pipeline's preprocessor, if any."""
+    try:
+        transformers = pipeline.named_steps["preprocessor"].transformers_
+    except (AttributeError, KeyError):
+        return set()
+    return {c for name, _, cols in transformers if name == "num" for c in cols}
+
+
+def _get_row_dtype() -> np.dtype:
+    """Structured row dtype for feature_cols: float64 for numeric model inputs, object otherwise."""
+    global _row_dtype
+    if _row_dtype is None or _row_dtype.names != tuple(feature_cols):
+        numeric = _numeric_model_inputs(model)
+        _row_dtype = np.dtype([(c, "f8" if c in numeric else "O") for c in feature_cols])
+    return _row_dtype
 
 
-app = FastAPI(title="DriftGuard-ML")
+# Load model at import time (best-effort; /predict will guard if missing)
+_maybe_reload_model()
+if not feature_cols:
+    feature_cols = _load_feature_cols()
+
+
+class NumpyJSONResponse(JSONResponse):
+    """JSON rendered by orjson; NumPy arrays and scalars are encoded natively (no .tolist())."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+app = FastAPI(title="DriftGuard-ML", default_response_class=NumpyJSONResponse)
 
 
 class PredictRequest(BaseModel):
@@ -57,64 +131,128 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-def _psi(expected: pd.Series, actual: pd.Series, buckets: int = 10) -> float:
-    """Population Stability Index between expected and actual distributions."""
-    expected_arr = np.asarray(expected, dtype=float)
-    actual_arr = np.asarray(actual, dtype=float)
-    expected_arr = expected_arr[~np.isnan(expected_arr)]
-    actual_arr = actual_arr[~np.isnan(actual_arr)]
+# Reference-side drift inputs per column: (lo, scale, expected_pct, sorted values); scale == 0
+# marks a constant column and None an all-NaN one.
+_ReferenceStats = tuple[float, float, np.ndarray, np.ndarray] | None
+
+
+@lru_cache(maxsize=2)
+def _reference_stats_store(path_str: str, mtime: float) -> dict[str, _ReferenceStats]:
+    """
+    Per-column reference stats for one (path, mtime), filled lazily by _detect_drift. Each reference
+    version gets its own dict, so requests on an older version never see or refill a newer one's entries.
+    """
+    return {}
+
+
+# Last frame read per path: path -> ((mtime, columns), frame). One entry per path, so a superseded
+# version is released as soon as the file changes rather than pinned until evicted.
+_df_cache: dict[str, tuple[tuple[float, tuple[str, ...]], pd.DataFrame]] = {}
 
-    if len(expected_arr) == 0 or len(actual_arr) == 0:
-        return float("nan")
 
+def _load_df(path_str: str, mtime: float, columns: tuple[str, ...]) -> pd.DataFrame:
+    """Read the given Parquet columns once per (path, mtime); callers must not mutate the result."""
+    cached = _df_cache.get(path_str)
+    if cached is not None and cached[0] == (mtime, columns):
+        return cached[1]
+    df = pd.read_parquet(path_str, columns=list(columns))
+    _df_cache[path_str] = ((mtime, columns), df)
+    return df
+
+
+def _schema_dtypes(path_str: str) -> pd.Series:
+    """Column dtypes from the Parquet footer, without reading any data pages."""
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(path_str).empty_table().to_pandas().dtypes
+
+
+@lru_cache(maxsize=4)
+def _numeric_columns(path_str: str, mtime: float) -> tuple[str, ...]:
+    """Numeric columns of a Parquet file; dtype checks run once per (path, mtime)."""
+    dtypes = _schema_dtypes(path_str)
+    return tuple(c for c, dtype in dtypes.items() if pd.api.types.is_numeric_dtype(dtype))
+
+
+@lru_cache(maxsize=4)
+def _column_names(path_str: str, mtime: float) -> frozenset[str]:
+    """Column names of a Parquet file, read once per (path, mtime)."""
+    return frozenset(_schema_dtypes(path_str).index)
+
+
+def _clean(values: pd.Series) -> np.ndarray:
+    """Float array with NaNs dropped."""
+    arr = np.asarray(values, dtype=float)
+    return arr[~np.isnan(arr)]
+
+
+def _reference_stats(expected: pd.Series, buckets: int = 10) -> _ReferenceStats:
+    """Bin edges, clipped bin proportions and sorted values of a reference column."""
+    expected_sorted = np.sort(_clean(expected))
+    if len(expected_sorted) == 0:
+        return None
+
+    lo = float(expected_sorted[0])
+    hi = float(expected_sorted[-1])
     # Constant expected: single bin
-    if np.ptp(expected_arr) == 0:
-        c = float(np.min(expected_arr))
-        expected_pct = np.array([1.0])
-        in_bin = np.sum(np.abs(actual_arr - c) <= 1e-10) if len(actual_arr) > 0 else 0
-        p = in_bin / len(actual_arr) if len(actual_arr) > 0 else 0.0
-        actual_pct = np.array([max(1e-10, min(p, 1.0))])
-    else:
-        _, bin_edges = np.histogram(expected_arr, bins=buckets)
-        if np.ptp(bin_edges) == 0:
-            expected_pct = np.array([1.0])
-            actual_pct = np.array([1.0])
-        else:
-            expected_counts, _ = np.histogram(expected_arr, bins=bin_edges)
-            actual_counts, _ = np.histogram(actual_arr, bins=bin_edges)
-            expected_pct = expected_counts / max(expected_counts.sum(), 1)
-            actual_pct = actual_counts / max(actual_counts.sum(), 1)
-            expected_pct = np.clip(expected_pct, 1e-10, 1.0)
-            actual_pct = np.clip(actual_pct, 1e-10, 1.0)
-
-    ratio = np.clip(actual_pct / expected_pct, 1e-10, 1e10)
-    return float(np.sum((actual_pct - expected_pct) * np.log(ratio)))
+    if hi == lo:
+        return lo, 0.0, np.array([1.0]), expected_sorted
+    scale = buckets / (hi - lo)
+    expected_counts = _bin_counts(expected_sorted, lo, scale, buckets)
+    expected_pct = np.clip(expected_counts / max(expected_counts.sum(), 1), _EPS, 1.0)
+    return lo, scale, expected_pct, expected_sorted
+
 
+def _psi_from_stats(stats: _ReferenceStats, actual_arr: np.ndarray, buckets: int = 10) -> float:
+    """PSI of a NaN-free actual array against precomputed reference stats."""
+    if stats is None or len(actual_arr) == 0:
+        return float("nan")
 
-def _ks_test(expected: pd.Series, actual: pd.Series) -> tuple[float, float]:
-    """Two-sample KS test, returning (statistic, pvalue)."""
-    from scipy.stats import ks_2samp
+    lo, scale, expected_pct, _ = stats
+    if scale == 0.0:
+        in_bin = np.sum(np.abs(actual_arr - lo) <= _EPS)
+        p = in_bin / len(actual_arr)
+        actual_pct = np.array([max(_EPS, min(p, 1.0))])
+    else:
+        actual_counts = _bin_counts(actual_arr, lo, scale, buckets)
+        actual_pct = np.clip(actual_counts / max(actual_counts.sum(), 1), _EPS, 1.0)
 
-    expected_arr = np.asarray(expected, dtype=float)
-    actual_arr = np.asarray(actual, dtype=float)
-    expected_arr = expected_arr[~np.isnan(expected_arr)]
-    actual_arr = actual_arr[~np.isnan(actual_arr)]
-    if len(expected_arr) == 0 or len(actual_arr) == 0:
-        return float("nan"), float("nan")
-    stat, pvalue = ks_2samp(expected_arr, actual_arr)
-    return float(stat), float(pvalue)
+    ratio = np.clip(actual_pct / expected_pct, _EPS, 1.0 / _EPS)
+    return float(np.sum((actual_pct - expected_pct) * np.log(ratio)))
 
 
-def _detect_drift(reference_df: pd.DataFrame, current_df: pd.DataFrame, numeric_cols: list[str]) -> dict:
-    """Compute PSI and KS metrics per numeric feature."""
+def _psi(expected: pd.Series, actual: pd.Series, buckets: int = 10) -> float:
+    """Population Stability Index between expected and actual distributions."""
+    return _psi_from_stats(_reference_stats(expected, buckets), _clean(actual), buckets)
+
+
+def _detect_drift(
+    reference_df: pd.DataFrame,
+    current_df: pd.DataFrame,
+    numeric_cols: list[str],
+    reference_stats: dict[str, _ReferenceStats] | None = None,
+) -> dict:
+    """
+    Compute PSI and KS metrics per numeric feature.
+    reference_stats, if given, is read for cached reference bins/sorted values and filled for missing columns.
+    """
+    if reference_stats is None:
+        reference_stats = {}
     results: dict[str, dict[str, float]] = {}
     for col in numeric_cols:
         if col not in reference_df.columns or col not in current_df.columns:
             continue
-        ref = reference_df[col]
-        cur = current_df[col]
-        psi_val = _psi(ref, cur)
-        ks_stat, ks_pvalue = _ks_test(ref, cur)
+        if col in reference_stats:
+            stats = reference_stats[col]
+        else:
+            stats = reference_stats[col] = _reference_stats(reference_df[col])
+        # Sorted once: binning ignores order and KS reuses it against the cached sorted reference
+        cur = np.sort(_clean(current_df[col]))
+        psi_val = _psi_from_stats(stats, cur)
+        if stats is None or len(cur) == 0:
+            ks_stat, ks_pvalue = float("nan"), float("nan")
+        else:
+            ks_stat, ks_pvalue = _ks_sorted(stats[3], cur)
         results[col] = {
             "psi": psi_val,
             "ks_stat": ks_stat,
@@ -132,20 +270,25 @@ def drift_report() -> dict:
         if not CURRENT_PATH.exists():
             raise FileNotFoundError(f"Current file not found: {CURRENT_PATH}")
 
-        reference_df = pd.read_csv(REFERENCE_PATH)
-        current_df = pd.read_csv(CURRENT_PATH)
+        reference_mtime = REFERENCE_PATH.stat().st_mtime
+        current_mtime = CURRENT_PATH.stat().st_mtime
 
+        # Only numeric columns are decoded: select them from the schemas before reading
+        current_cols = _column_names(str(CURRENT_PATH), current_mtime)
         numeric_cols = [
-            c
-            for c in reference_df.columns
-            if pd.api.types.is_numeric_dtype(reference_df[c]) and c in current_df.columns
+            c for c in _numeric_columns(str(REFERENCE_PATH), reference_mtime) if c in current_cols
         ]
         if not numeric_cols:
             return {"max_psi": None, "per_feature": {}, "status": "no_numeric_columns"}
 
-        per_feature = _detect_drift(reference_df, current_df, numeric_cols)
-        psi_values = [m["psi"] for m in per_feature.values() if not (m["psi"] != m["psi"])]
-        max_psi = max(psi_values) if psi_values else None
+        reference_df = _load_df(str(REFERENCE_PATH), reference_mtime, tuple(numeric_cols))
+        current_df = _load_df(str(CURRENT_PATH), current_mtime, tuple(numeric_cols))
+
+        reference_stats = _reference_stats_store(str(REFERENCE_PATH), reference_mtime)
+        per_feature = _detect_drift(reference_df, current_df, numeric_cols, reference_stats)
+        psi_arr = np.fromiter((m["psi"] for m in per_feature.values()), dtype=float, count=len(per_feature))
+        psi_arr = psi_arr[~np.isnan(psi_arr)]
+        max_psi = float(psi_arr.max()) if psi_arr.size else None
         status = (
             "retrain"
             if max_psi is not None and max_psi >= PSI_RETRAIN_THRESHOLD
@@ -163,7 +306,8 @@ def drift_report() -> dict:
 
 
 @app.post("/predict")
-def predict(request: PredictRequest) -> dict:
+def predict(request: PredictRequest) -> NumpyJSONResponse:
+    _maybe_reload_model()
     if model is None:
         raise HTTPException(
             status_code=503,
@@ -175,18 +319,27 @@ def predict(request: PredictRequest) -> dict:
             detail="feature_cols not available; ensure models/metadata.json contains feature_cols.",
         )
 
-    df = pd.DataFrame(request.data)
-    missing = [c for c in feature_cols if c not in df.columns]
+    rows = request.data
+    present = set().union(*rows)
+    missing = [c for c in feature_cols if c not in present]
     if missing:
         raise HTTPException(
             status_code=422,
             detail={"missing_columns": sorted(missing)},
         )
 
-    X = df[feature_cols]
+    # Fill a buffer typed from the known schema: no per-request dtype inference or reindex
+    buf = np.empty(len(rows), dtype=_get_row_dtype())
+    try:
+        for i, row in enumerate(rows):
+            buf[i] = tuple(row.get(c, np.nan) for c in feature_cols)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Non-numeric value for a numeric feature: {e}") from e
+    X = pd.DataFrame(buf)
     proba = model.predict_proba(X)[:, 1]
-    predictions = (proba >= 0.5).astype(int).tolist()
-    return {"predictions": predictions, "probabilities": proba.tolist()}
+    predictions = (proba >= 0.5).astype(int)
+    # Returned as a response so the arrays go straight to orjson, skipping FastAPI's encoder
+    return NumpyJSONResponse({"predictions": predictions, "probabilities": proba})
 
 
 if __name__ == "__main__":
@@ -2,6 +2,8 @@
 
 import argparse
 import json
+import os
+from collections.abc import Callable
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -27,6 +29,13 @@ def _detect_feature_types(df: pd.DataFrame) -> tuple[list[str], list[str]]:
     return numeric, categorical
 
 
+def _write_atomic(path: Path, write: Callable[[Path], object]) -> None:
+    """Write via a temp file in the same directory, then os.replace it over path (readers see old or new, never partial)."""
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Train XGBoost classifier with preprocessing.")
     parser.add_argument("--input", required=True, help="Path to input data (.csv or .parquet)")
@@ -73,7 +82,7 @@ def main() -> None:
         models_dir = Path("models")
         models_dir.mkdir(parents=True, exist_ok=True)
         model_path = models_dir / "model.pkl"
-        joblib.dump(pipeline, model_path)
+        metadata_path = models_dir / "metadata.json"
 
         metadata = {
             "cv_auc_mean": cv_auc_mean,
@@ -85,9 +94,10 @@ def main() -> None:
             "n_numeric": len(numeric_features),
             "n_categorical": len(categorical_features),
         }
-        metadata_path = models_dir / "metadata.json"
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=2)
+        # Metadata first, then the model, each swapped in atomically: serve.py memory-maps model.pkl,
+        # so it must never be truncated in place, and it reloads when either file's mtime changes
+        _write_atomic(metadata_path, lambda tmp: tmp.write_text(json.dumps(metadata, indent=2)))
+        _write_atomic(model_path, lambda tmp: joblib.dump(pipeline, tmp))
 
         # Log artifacts to MLflow
         mlflow.log_artifact(str(model_path), artifact_path="model")
@@ -1,135 +1,287 @@
-"""Data quality gate: validate data/processed/current.csv. Exit 0 pass, 1 fail. Uses Great Expectations minimally."""
+"""Data quality gate: validate data/processed/current.parquet. Exit 0 pass, 1 fail. Great Expectations runs only with DRIFTGUARD_STRICT=1."""
 
+import importlib.util
+import json
+import os
 import sys
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from types import ModuleType
+from typing import Any
 
+import numpy as np
 import pandas as pd
 
-from data_preprocessing import load_data
-
-REFERENCE_PATH = Path("data/processed/reference.csv")
-CURRENT_PATH = Path("data/processed/current.csv")
+REFERENCE_PATH = Path("data/processed/reference.parquet")
+CURRENT_PATH = Path("data/processed/current.parquet")
 DEFAULT_REQUIRED_COLUMNS = ["feature1", "feature2", "target"]
+# Rows per streamed chunk of the current file
+CHUNK_ROWS = 100_000
+# Column-parallel aggregation only pays for the pool on wide frames
+PARALLEL_MIN_COLUMNS = 32
+# Offenders listed per failing check; the rest are elided
+MAX_REPORTED = 10
+
+
+def _data_preprocessing() -> ModuleType:
+    """
+    data_preprocessing, imported on first use: it pulls in sklearn, which dominates import time on
+    main's missing-file exit. Works both as src.validate_data and as a CLI script run from src/.
+    """
+    try:
+        from . import data_preprocessing
+    except ImportError:
+        import data_preprocessing
+    return data_preprocessing
 
 
-def _get_required_columns() -> list[str]:
-    """Required columns from reference.csv if it exists, else default list."""
+@lru_cache(maxsize=1)
+def _get_required_columns() -> tuple[str, ...]:
+    """Required columns from reference.parquet if it exists, else default list. Only the footer schema is read."""
     if REFERENCE_PATH.exists():
-        df = load_data(REFERENCE_PATH)
-        return list(df.columns)
-    return list(DEFAULT_REQUIRED_COLUMNS)
+        return tuple(_data_preprocessing().load_schema(REFERENCE_PATH).index)
+    return tuple(DEFAULT_REQUIRED_COLUMNS)
 
 
-def _check_required_columns(df: pd.DataFrame, required: list[str]) -> tuple[bool, str]:
-    missing = [c for c in required if c not in df.columns]
+def _preview(items, limit: int = MAX_REPORTED) -> str:
+    """Format at most `limit` offenders (list, Index or ndarray) for an error message, with "..." if truncated."""
+    head = items[:limit]
+    shown = head.tolist() if hasattr(head, "tolist") else list(head)
+    return f"{shown}{'...' if len(items) > limit else ''}"
+
+
+def _check_required_columns(columns: pd.Index, required: tuple[str, ...]) -> tuple[bool, str]:
+    missing = frozenset(required).difference(columns)
     if missing:
-        return False, f"Missing required columns: {missing}"
+        # Report in reference order; the ordered list is only built on failure
+        return False, f"Missing required columns: {_preview([c for c in required if c in missing])}"
     return True, ""
 
 
-def _check_target_binary(df: pd.DataFrame, target: str) -> tuple[bool, str]:
-    if target not in df.columns:
+def _check_target_binary(values: pd.Series | None, target: str) -> tuple[bool, str]:
+    """values: the target column, or any subset holding all its distinct values; None if absent."""
+    if values is None:
         return False, f"Target column '{target}' not in data"
-    vals = df[target].dropna()
-    if len(vals) == 0:
+    present = values.dropna()
+    if present.empty:
         return False, "Target column is all null"
-    try:
-        uniq = set(vals.astype(int).unique())
-    except (ValueError, TypeError):
+    if not pd.api.types.is_numeric_dtype(present):
         return False, "Target has non-numeric values"
-    if not uniq.issubset({0, 1}):
-        return False, f"Target must be binary (0/1); found values: {uniq}"
+    # One sort-based pass to the distinct values, then membership on that (tiny) array
+    uniq = np.unique(present.to_numpy())
+    bad = uniq[~np.isin(uniq, (0, 1))]
+    if bad.size:
+        return False, f"Target must be binary (0/1); found values: {_preview(bad)}"
     return True, ""
 
 
-def _check_no_all_null_columns(df: pd.DataFrame) -> tuple[bool, str]:
-    all_null = [c for c in df.columns if df[c].isna().all()]
-    if all_null:
-        return False, f"Completely null columns: {all_null}"
+def _check_no_all_null_columns(nulls: pd.Series, n_rows: int) -> tuple[bool, str]:
+    mask = (nulls == n_rows).to_numpy()
+    if mask.any():
+        return False, f"Completely null columns: {_preview(nulls.index[mask])}"
     return True, ""
 
 
-def _check_numeric_min_distinct(df: pd.DataFrame, min_distinct: int = 2) -> tuple[bool, str]:
-    bad = []
-    for c in df.columns:
-        if not pd.api.types.is_numeric_dtype(df[c]):
-            continue
-        if df[c].nunique() < min_distinct:
-            bad.append(c)
-    if bad:
-        return False, f"Numeric columns with < {min_distinct} distinct values: {bad}"
+def _check_numeric_min_distinct(nunique: pd.Series, min_distinct: int = 2) -> tuple[bool, str]:
+    """nunique: distinct (non-null) counts of the numeric columns, possibly capped at min_distinct."""
+    mask = (nunique < min_distinct).to_numpy()
+    if mask.any():
+        return False, f"Numeric columns with < {min_distinct} distinct values: {_preview(nunique.index[mask])}"
     return True, ""
 
 
-def _run_great_expectations(df: pd.DataFrame, target: str) -> tuple[bool, str]:
-    """Run minimal GE expectations (target binary) using programmatic expectations."""
-    try:
-        import great_expectations as gx
-    except ImportError:
-        return True, ""  # skip if GE not installed
+def _accumulate(chunk: pd.DataFrame, distinct: dict[str, set], min_distinct: int) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Null counts of chunk and min/max of its numeric columns (vectorized reductions). Distinct sets are only
+    fed when min_distinct > 2; otherwise they are empty, since min == max already decides "constant".
+    """
+    for c in chunk.columns:
+        seen = distinct.get(c)
+        if seen is not None and len(seen) < min_distinct:
+            seen.update(chunk[c].dropna().unique()[:min_distinct].tolist())
+    return chunk.isna().sum(), chunk.min(numeric_only=True), chunk.max(numeric_only=True)
+
+
+def _merge_bounds(bounds: dict[str, tuple], mins: pd.Series, maxs: pd.Series) -> None:
+    """Fold a chunk's per-column min/max into the running bounds; columns with no values in the chunk are skipped."""
+    for c, lo, hi in zip(mins.index, mins.array, maxs.array):
+        if pd.isna(lo):
+            continue
+        if c in bounds:
+            lo = min(bounds[c][0], lo)
+            hi = max(bounds[c][1], hi)
+        bounds[c] = (lo, hi)
+
+
+def _run_all_checks(
+    chunks: Iterable[pd.DataFrame],
+    required: tuple[str, ...],
+    target: str,
+    min_distinct: int = 2,
+) -> list[tuple[str, bool, str]]:
+    """
+    Run every column-level check over a stream of row chunks, so only one chunk is in memory at a time.
+    Per-chunk aggregates are combined: null counts are summed, numeric min/max are folded (a column is
+    constant iff min == max), and target values are deduplicated per chunk. For min_distinct > 2,
+    distinct values of numeric columns are collected until min_distinct is reached.
+    Wide frames split each chunk's columns across a thread pool (pandas/NumPy release the GIL).
+    Returns (name, ok, error) per check, in reporting order.
+    """
+    columns = None
+    n_rows = 0
+    nulls = None
+    numeric: list[str] = []
+    bounds: dict[str, tuple] = {}
+    distinct: dict[str, set] = {}
+    target_parts: list[pd.Series] = []
+    pool = None
+    groups: list[np.ndarray] = []
     try:
-        # Ephemeral context and pandas datasource (GE 1.x)
-        context = gx.get_context(mode="ephemeral")
-        datasource = context.sources.add_pandas("pandas")
-        batch_request = datasource.read_dataframe(df)
-        suite_name = "data_quality_gate"
-        context.add_expectation_suite(expectation_suite_name=suite_name)
-        validator = context.get_validator(
-            batch_request=batch_request,
-            expectation_suite_name=suite_name,
+        for chunk in chunks:
+            if columns is None:
+                columns = chunk.columns
+                nulls = pd.Series(0, index=columns, dtype=np.int64)
+                numeric = [c for c in columns if pd.api.types.is_numeric_dtype(chunk[c])]
+                if min_distinct > 2:
+                    distinct = {c: set() for c in numeric}
+                # Never more groups than columns: empty groups would feed empty Series to pd.concat
+                n_workers = min(os.cpu_count() or 1, len(columns))
+                if len(columns) > PARALLEL_MIN_COLUMNS and n_workers > 1:
+                    pool = ThreadPoolExecutor(max_workers=n_workers)
+                    groups = np.array_split(np.arange(len(columns)), n_workers)
+            n_rows += len(chunk)
+            if pool is None:
+                parts = [_accumulate(chunk, distinct, min_distinct)]
+            else:
+                # Each group owns disjoint columns, so the distinct sets are never shared between threads
+                parts = list(pool.map(lambda g: _accumulate(chunk.iloc[:, g], distinct, min_distinct), groups))
+            nulls += pd.concat([p[0] for p in parts])
+            _merge_bounds(bounds, pd.concat([p[1] for p in parts]), pd.concat([p[2] for p in parts]))
+            if target in columns:
+                target_parts.append(chunk[target].drop_duplicates())
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    target_values = pd.concat(target_parts, ignore_index=True) if target_parts else None
+    if min_distinct > 2:
+        nunique = pd.Series({c: len(distinct[c]) for c in numeric}, dtype=np.int64)
+    else:
+        # Distinct count capped at 2 from the bounds: 0 all null, 1 constant, 2 otherwise
+        nunique = pd.Series(
+            {c: 0 if c not in bounds else 1 if bounds[c][0] == bounds[c][1] else 2 for c in numeric},
+            dtype=np.int64,
         )
-        validator.expect_column_to_exist(target)
-        validator.expect_column_values_to_be_in_set(column=target, value_set=[0, 1])
-        validator.save_expectation_suite()
-        result = validator.validate()
+    return [
+        ("Required columns", *_check_required_columns(columns, required)),
+        ("Target binary (0/1)", *_check_target_binary(target_values, target)),
+        ("No all-null columns", *_check_no_all_null_columns(nulls, n_rows)),
+        ("Numeric columns ≥2 distinct", *_check_numeric_min_distinct(nunique, min_distinct)),
+    ]
+
+
+def _to_categorical(df: pd.DataFrame, max_ratio: float = 0.5) -> pd.DataFrame:
+    """Shallow copy of df with low-cardinality object columns as category (GE then compares int codes)."""
+    out = df.copy(deep=False)
+    obj = out.select_dtypes(include="object")
+    if obj.empty:
+        return out
+    ratio = obj.nunique(dropna=True) / max(len(out), 1)
+    for c in ratio.index[ratio < max_ratio]:
+        out[c] = out[c].astype("category")
+    return out
+
+
+@lru_cache(maxsize=1)
+def _ge_validator_factory(target: str) -> Callable[[pd.DataFrame], Any]:
+    """
+    Build the GE context, pandas data source, whole-dataframe batch definition and suite (target exists,
+    values in {0, 1}) once per process; the returned df -> validation result closure only binds the new
+    frame. Construction errors are not cached, so a later call retries.
+    """
+    import great_expectations as gx
+
+    # Ephemeral context and pandas data source (GE 1.x fluent API)
+    context = gx.get_context(mode="ephemeral")
+    asset = context.data_sources.add_pandas("pandas").add_dataframe_asset(name="current")
+    batch_definition = asset.add_batch_definition_whole_dataframe("current")
+    suite = context.suites.add(gx.ExpectationSuite(name="data_quality_gate"))
+    suite.add_expectation(gx.expectations.ExpectColumnToExist(column=target))
+    suite.add_expectation(gx.expectations.ExpectColumnValuesToBeInSet(column=target, value_set=[0, 1]))
+
+    def validate(df: pd.DataFrame) -> Any:
+        batch = batch_definition.get_batch(batch_parameters={"dataframe": _to_categorical(df)})
+        return batch.validate(suite)
+
+    return validate
+
+
+def _run_great_expectations(path: Path, columns: list[str], target: str) -> tuple[bool, str] | None:
+    """
+    Run minimal GE expectations (target binary) using programmatic expectations. GE needs the whole frame.
+    Opt-in via DRIFTGUARD_STRICT=1: the built-in checks already cover both expectations.
+    Returns None when skipped (not opted in, or GE not installed).
+    """
+    if os.environ.get("DRIFTGUARD_STRICT") != "1":
+        return None
+    if importlib.util.find_spec("great_expectations") is None:
+        return None
+    try:
+        df = _data_preprocessing().load_data(path, columns=columns)
+        result = _ge_validator_factory(target)(df)
         if not result.success:
-            parts = [
-                getattr(r, "expectation_config", {}) and r.expectation_config.get("expectation_type", "")
-                for r in result.results
-                if not getattr(r, "success", True)
-            ]
+            parts = [r.expectation_config.type for r in result.results if not r.success]
             return False, f"Great Expectations failed: {parts}"
     except Exception as e:
         return False, f"Great Expectations error: {e}"
     return True, ""
 
 
-def main() -> int:
-    print("DriftGuard data quality gate")
-    print("  Current data:", CURRENT_PATH)
+def _emit(status: str, check: str | None = None, error: str | None = None, results: list | None = None) -> int:
+    """Write the gate outcome as one JSON line to stdout; return the exit code."""
+    report = {
+        "status": status,
+        "current": str(CURRENT_PATH),
+        "check": check,
+        "error": error,
+        "results": [{"check": name, "ok": ok, "error": err} for name, ok, err in results or []],
+    }
+    sys.stdout.write(json.dumps(report) + "\n")
+    sys.stdout.flush()
+    return 0 if status == "pass" else 1
+
 
+def main() -> int:
     if not CURRENT_PATH.exists():
-        print("[FAIL] Current file not found:", CURRENT_PATH)
-        return 1
+        return _emit("fail", "Current file", f"Current file not found: {CURRENT_PATH}")
 
-    try:
-        df = load_data(CURRENT_PATH)
-    except Exception as e:
-        print("[FAIL] Failed to load data:", e)
-        return 1
+    dp = _data_preprocessing()
 
     required = _get_required_columns()
     target = "target" if "target" in required else (required[0] if required else "target")
+    try:
+        # Decode only the required columns the file actually has; missing ones are reported by the check
+        present = set(dp.load_schema(CURRENT_PATH).index)
+        columns = [c for c in required if c in present]
+        results = _run_all_checks(dp.iter_data(CURRENT_PATH, columns=columns, chunksize=CHUNK_ROWS), required, target)
+    except Exception as e:
+        return _emit("fail", "Load data", f"Failed to load data: {e}")
 
-    checks = [
-        ("Required columns", lambda d: _check_required_columns(d, required)),
-        ("Target binary (0/1)", lambda d: _check_target_binary(d, target)),
-        ("No all-null columns", _check_no_all_null_columns),
-        ("Numeric columns ≥2 distinct", _check_numeric_min_distinct),
-    ]
-    for name, run in checks:
-        ok, err = run(df)
+    for name, ok, err in results:
         if not ok:
-            print(f"[FAIL] {name}: {err}")
-            return 1
+            return _emit("fail", name, err, results)
 
-    ok, err = _run_great_expectations(df, target)
-    if not ok:
-        print(f"[FAIL] {err}")
-        return 1
+    # Only reported when GE actually ran, so consumers never see a pass for a skipped check
+    ge_result = _run_great_expectations(CURRENT_PATH, columns, target)
+    if ge_result is not None:
+        ok, err = ge_result
+        results.append(("Great Expectations", ok, err))
+        if not ok:
+            return _emit("fail", "Great Expectations", err, results)
 
-    print("[PASS] Data quality gate passed.")
-    return 0
+    return _emit("pass", results=results)
 
 
 if __name__ == "__main__":
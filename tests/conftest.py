@@ -3,6 +3,23 @@
 import sys
 from pathlib import Path
 
+import pandas as pd
+import pytest
+
 root = Path(__file__).resolve().parent.parent
 if str(root) not in sys.path:
     sys.path.insert(0, str(root))
+
+
+@pytest.fixture(scope="module")
+def drift_frames() -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+    """Small reference/current frames and their numeric columns, built once per test module. Do not mutate."""
+    reference = pd.DataFrame({
+        "a": [1.0, 2.0, 3.0, 4.0, 5.0],
+        "b": [10.0, 20.0, 30.0, 40.0, 50.0],
+    })
+    current = pd.DataFrame({
+        "a": [1.1, 2.1, 3.1, 4.1, 5.1],
+        "b": [10.0, 20.0, 30.0, 40.0, 50.0],
+    })
+    return reference, current, ["a", "b"]
@@ -1,21 +1,23 @@
 """Test drift detection: detect_drift returns expected keys and numeric PSI results."""
 
+import numpy as np
 import pandas as pd
 import pytest
+from scipy.stats import ks_2samp
 
-from src.drift import detect_drift
+from src.drift import _psi_numpy, detect_drift, ks_test, psi
 
 
-def test_detect_drift_returns_keys_and_numeric_psi():
-    reference = pd.DataFrame({
-        "a": [1.0, 2.0, 3.0, 4.0, 5.0],
-        "b": [10.0, 20.0, 30.0, 40.0, 50.0],
-    })
-    current = pd.DataFrame({
-        "a": [1.1, 2.1, 3.1, 4.1, 5.1],
-        "b": [10.0, 20.0, 30.0, 40.0, 50.0],
-    })
-    numeric_cols = ["a", "b"]
+@pytest.fixture(scope="module", autouse=True)
+def warm_psi_kernels():
+    """Compile (or load from cache) the numba kernels once so JIT cost is not billed to a single test."""
+    values = np.arange(20, dtype=np.float32)
+    psi(values, values)
+    detect_drift(pd.DataFrame({c: values for c in "abcde"}), pd.DataFrame({c: values for c in "abcde"}), list("abcde"))
+
+
+def test_detect_drift_returns_keys_and_numeric_psi(drift_frames):
+    reference, current, numeric_cols = drift_frames
     result = detect_drift(reference, current, numeric_cols)
 
     assert set(result.keys()) == set(numeric_cols)
@@ -28,3 +30,99 @@ def test_detect_drift_returns_keys_and_numeric_psi():
         assert isinstance(row["psi"], (int, float))
         assert isinstance(row["ks_stat"], (int, float))
         assert isinstance(row["ks_pvalue"], (int, float))
+
+
+def test_detect_drift_skips_missing_columns_and_drops_nans():
+    reference = pd.DataFrame({"a": [1.0, 2.0, float("nan"), 4.0, 5.0]})
+    current = pd.DataFrame({"a": [1.0, 2.0, 3.0, float("nan"), 5.0]})
+    result = detect_drift(reference, current, ["a", "missing"])
+
+    assert set(result.keys()) == {"a"}
+    assert result["a"]["psi"] == result["a"]["psi"]  # not NaN
+    assert result["a"]["psi"] >= 0.0
+
+
+def test_detect_drift_keeps_float64_for_large_magnitude_features():
+    # Epoch-second timestamps are not representable in float32 at 1-second resolution
+    ts = 1.7e9 + np.arange(60.0)
+    reference = pd.DataFrame({c: ts for c in "abcde"})
+    current = pd.DataFrame({c: ts + 30 for c in "abcde"})
+    result = detect_drift(reference, current, list("abcde"))
+
+    expected = psi(ts, ts + 30)
+    assert expected > 0.25
+    for col in "abcde":
+        assert result[col]["psi"] == pytest.approx(expected)
+
+
+def test_psi_counts_out_of_range_values_in_edge_bins():
+    reference = [float(i) for i in range(100)]
+    assert psi(reference, reference) == 0.0
+    # Current values beyond the reference range are binned, not dropped
+    shifted = [float(i) for i in range(50, 150)]
+    assert psi(reference, shifted) > psi(reference, [float(i) for i in range(25, 125)]) > 0.0
+
+
+def test_psi_batch_matches_per_column_psi():
+    drift_numba = pytest.importorskip("src.drift_numba")
+    if drift_numba.psi_batch is None:
+        pytest.skip("numba not installed")
+    rng = np.random.default_rng(0)
+    ref = rng.normal(size=(500, 6)).astype(np.float32)
+    cur = (rng.normal(size=(400, 6)) + np.linspace(0.0, 1.0, 6)).astype(np.float32)
+    ref[::7, 1] = np.nan
+    ref[:, 2] = 3.0  # constant reference column
+    cur[:, 3] = np.nan  # empty current column
+
+    batch = drift_numba.psi_batch(np.ascontiguousarray(ref.T), np.ascontiguousarray(cur.T), 10)
+    expected = [psi(ref[:, j], cur[:, j]) for j in range(ref.shape[1])]
+    np.testing.assert_allclose(batch, expected, rtol=1e-6, equal_nan=True)
+
+
+def test_numba_psi_reduction_matches_python():
+    drift_numba = pytest.importorskip("src.drift_numba")
+    if drift_numba.psi_from_counts is None:
+        pytest.skip("numba not installed")
+    rng = np.random.default_rng(3)
+    e_counts = rng.integers(0, 50, size=10)
+    a_counts = rng.integers(0, 50, size=10)
+    a_counts[4] = 0  # empty bucket hits the _EPS clip
+    n_e, n_a = int(e_counts.sum()), int(a_counts.sum())
+    assert drift_numba.psi_from_counts(e_counts, a_counts, n_e, n_a) == pytest.approx(
+        drift_numba._psi_from_counts(e_counts, a_counts, n_e, n_a)
+    )
+
+
+def test_ks_test_matches_scipy_asymptotic():
+    rng = np.random.default_rng(1)
+    expected = rng.normal(size=300)
+    actual = np.round(rng.normal(0.2, 1.0, size=250), 1)  # ties
+    ref = ks_2samp(expected, actual, method="asymp")
+    stat, pvalue = ks_test(expected, actual)
+    assert stat == pytest.approx(ref.statistic)
+    assert pvalue == pytest.approx(ref.pvalue)
+    assert np.isnan(ks_test(expected, actual, pvalue=False)[1])
+
+
+def test_psi_accepts_non_native_float_dtypes():
+    values = np.arange(20.0)
+    shifted = values + 5
+    expected = psi(values, shifted)
+    for dtype in (np.float16, np.longdouble):
+        assert psi(values.astype(dtype), shifted.astype(dtype)) == pytest.approx(expected)
+
+
+def test_cython_psi_kernel_matches_numpy():
+    drift_cy = pytest.importorskip("src.drift_cy")
+    rng = np.random.default_rng(2)
+    for dtype in (np.float32, np.float64):
+        expected = rng.normal(size=1000).astype(dtype)
+        actual = rng.normal(0.5, 1.0, size=800).astype(dtype)
+        lo, hi = float(expected.min()), float(expected.max())
+        assert drift_cy.psi_edges(expected, actual, lo, hi, 10) == pytest.approx(
+            _psi_numpy(expected, actual, lo, hi, 10)
+        )
+    constant = np.full(10, 3.0)
+    assert drift_cy.psi_edges(constant, np.array([3.0, 4.0]), 3.0, 3.0, 10) == pytest.approx(
+        _psi_numpy(constant, np.array([3.0, 4.0]), 3.0, 3.0, 10)
+    )
@@ -0,0 +1,170 @@
+"""Test serve.py model reload, drift-report caching and /predict. Model/data paths point at tmp_path."""
+
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src import serve
+from src.data_preprocessing import build_preprocessor
+from src.drift import ks_test
+
+
+@pytest.fixture
+def model_paths(tmp_path, monkeypatch):
+    """Point serve at empty models/ paths under tmp_path; model globals are restored after the test."""
+    model_path = tmp_path / "model.pkl"
+    metadata_path = tmp_path / "metadata.json"
+    monkeypatch.setattr(serve, "MODEL_PATH", model_path)
+    monkeypatch.setattr(serve, "METADATA_PATH", metadata_path)
+    for name in ("model", "feature_cols", "_model_version", "_row_dtype"):
+        monkeypatch.setattr(serve, name, getattr(serve, name))
+    serve._model_version = None
+    return model_path, metadata_path
+
+
+def _write_metadata(path, feature_cols, mtime):
+    path.write_text(json.dumps({"feature_cols": feature_cols}))
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_picks_up_metadata_written_after_model(model_paths):
+    model_path, metadata_path = model_paths
+    joblib.dump({"weights": [1.0, 2.0]}, model_path)
+    os.utime(model_path, (1_000, 1_000))
+    _write_metadata(metadata_path, ["a"], 1_000)
+    serve._maybe_reload_model()
+    assert serve.feature_cols == ["a"]
+
+    # Same model file, newer metadata: still a new version
+    _write_metadata(metadata_path, ["a", "b"], 2_000)
+    serve._maybe_reload_model()
+    assert serve.feature_cols == ["a", "b"]
+
+
+@pytest.fixture
+def drift_paths(tmp_path, monkeypatch):
+    """Point serve at reference/current Parquet files under tmp_path."""
+    reference_path = tmp_path / "reference.parquet"
+    current_path = tmp_path / "current.parquet"
+    monkeypatch.setattr(serve, "REFERENCE_PATH", reference_path)
+    monkeypatch.setattr(serve, "CURRENT_PATH", current_path)
+    monkeypatch.setattr(serve, "_df_cache", {})
+    return reference_path, current_path
+
+
+def _write_parquet(path, df, mtime):
+    df.to_parquet(path, index=False)
+    os.utime(path, (mtime, mtime))
+
+
+def test_drift_report_reference_stats_cached_per_reference_version(drift_paths):
+    reference_path, current_path = drift_paths
+    rng = np.random.default_rng(0)
+    current = pd.DataFrame({"x": rng.normal(1.0, 1.0, 500)})
+    _write_parquet(current_path, current, 1_000)
+
+    old_reference = pd.DataFrame({"x": rng.normal(0.0, 1.0, 500)})
+    _write_parquet(reference_path, old_reference, 1_000)
+    first = serve.drift_report()
+    old_store = serve._reference_stats_store(str(reference_path), 1_000.0)
+    assert set(old_store) == {"x"}
+    assert serve.drift_report() == first  # served from the cached stats
+
+    # New reference version: fresh stats, and the old version's entries are left alone
+    new_reference = pd.DataFrame({"x": rng.normal(1.0, 1.0, 500)})
+    _write_parquet(reference_path, new_reference, 2_000)
+    second = serve.drift_report()
+    assert serve._reference_stats_store(str(reference_path), 2_000.0) is not old_store
+    assert second["per_feature"]["x"]["psi"] == pytest.approx(serve._psi(new_reference["x"], current["x"]))
+    assert second["per_feature"]["x"]["psi"] < first["per_feature"]["x"]["psi"]
+    np.testing.assert_array_equal(old_store["x"][3], np.sort(old_reference["x"].to_numpy()))
+
+
+def test_drift_report_ks_matches_drift_module(drift_paths):
+    reference_path, current_path = drift_paths
+    rng = np.random.default_rng(2)
+    reference = pd.DataFrame({"x": rng.normal(size=300), "y": rng.normal(size=300)})
+    current = pd.DataFrame({"x": rng.normal(0.3, 1.0, 200), "y": np.nan})
+    _write_parquet(reference_path, reference, 1_000)
+    _write_parquet(current_path, current, 1_000)
+
+    per_feature = serve.drift_report()["per_feature"]
+    assert (per_feature["x"]["ks_stat"], per_feature["x"]["ks_pvalue"]) == pytest.approx(
+        ks_test(reference["x"], current["x"])
+    )
+    # No current values: NaN metrics rather than an error
+    assert np.isnan(per_feature["y"]["ks_stat"]) and np.isnan(per_feature["y"]["psi"])
+
+
+def test_drift_report_keeps_one_loaded_frame_per_path(drift_paths):
+    reference_path, current_path = drift_paths
+    rng = np.random.default_rng(1)
+    _write_parquet(reference_path, pd.DataFrame({"x": rng.normal(size=100)}), 1_000)
+    _write_parquet(current_path, pd.DataFrame({"x": rng.normal(size=100)}), 1_000)
+    serve.drift_report()
+
+    # New current version replaces the old frame instead of sitting next to it
+    new_current = pd.DataFrame({"x": rng.normal(2.0, 1.0, 100)})
+    _write_parquet(current_path, new_current, 2_000)
+    serve.drift_report()
+    assert set(serve._df_cache) == {str(reference_path), str(current_path)}
+    (mtime, _), frame = serve._df_cache[str(current_path)]
+    assert mtime == 2_000.0
+    pd.testing.assert_frame_equal(frame, new_current)
+
+
+@pytest.fixture
+def client(model_paths):
+    """TestClient over a small fitted pipeline with numeric a, b and categorical c."""
+    model_path, metadata_path = model_paths
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "a": rng.normal(size=200),
+        "b": rng.normal(size=200),
+        "c": rng.choice(["x", "y"], size=200),
+    })
+    y = (X["a"] + (X["c"] == "y") > 0.5).astype(int)
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor(["a", "b"], ["c"])),
+        ("classifier", LogisticRegression()),
+    ]).fit(X, y)
+    joblib.dump(pipeline, model_path)
+    _write_metadata(metadata_path, ["a", "b", "c"], 1_000)
+    return TestClient(serve.app), pipeline
+
+
+def test_predict_returns_pipeline_probabilities(client):
+    client, pipeline = client
+    rows = [
+        {"a": 1.5, "b": 0.0, "c": "y"},
+        {"a": -2.0, "b": 1.0, "c": "x", "extra": 3.0},  # unknown keys are ignored
+        {"a": 0.1, "c": "x"},  # b missing from this row only -> NaN, imputed by the pipeline
+    ]
+    response = client.post("/predict", json={"data": rows})
+
+    assert response.status_code == 200
+    body = response.json()
+    expected = pipeline.predict_proba(pd.DataFrame(rows).reindex(columns=["a", "b", "c"]))[:, 1]
+    np.testing.assert_allclose(body["probabilities"], expected)
+    assert body["predictions"] == (expected >= 0.5).astype(int).tolist()
+
+
+def test_predict_rejects_missing_feature_column(client):
+    client, _ = client
+    response = client.post("/predict", json={"data": [{"a": 1.0, "c": "x"}]})
+    assert response.status_code == 422
+    assert response.json()["detail"] == {"missing_columns": ["b"]}
+
+
+def test_predict_rejects_non_numeric_value_for_numeric_feature(client):
+    client, _ = client
+    response = client.post("/predict", json={"data": [{"a": "high", "b": 0.0, "c": "x"}]})
+    assert response.status_code == 422
+    assert "Non-numeric value" in response.json()["detail"]
@@ -0,0 +1,195 @@
+"""Test the streamed data quality checks in validate_data.py and the gate's JSON output."""
+
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import validate_data
+from src.data_preprocessing import iter_data
+
+REQUIRED = ("x", "y", "target")
+
+
+def _checks(chunks, required=REQUIRED, target="target", **kwargs) -> dict[str, tuple[bool, str]]:
+    """Run _run_all_checks and index the results by check name."""
+    return {name: (ok, err) for name, ok, err in validate_data._run_all_checks(chunks, required, target, **kwargs)}
+
+
+def _chunks(df: pd.DataFrame, size: int = 2) -> list[pd.DataFrame]:
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def _valid_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "x": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        "y": [1, 1, 1, 1, 1, 2],  # second distinct value only in the last chunk
+        "name": ["a", "a", "a", "a", "a", "a"],  # non-numeric: not subject to the distinct check
+        "target": [0, 1, 0, 1, 1, 0],
+    })
+
+
+def test_all_checks_pass_across_chunks():
+    results = _checks(_chunks(_valid_frame()))
+    assert all(ok for ok, _ in results.values()), results
+
+
+def test_column_parallel_path_matches_sequential(monkeypatch):
+    df = _valid_frame().assign(empty=np.nan, constant=7, **{f"f{i}": np.arange(6.0) * i for i in range(40)})
+    sequential = _checks(_chunks(df), required=tuple(df.columns))
+
+    # More workers than columns: groups are capped at the column count (no empty groups)
+    monkeypatch.setattr(validate_data.os, "cpu_count", lambda: 64)
+    monkeypatch.setattr(validate_data, "PARALLEL_MIN_COLUMNS", 4)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        parallel = _checks(_chunks(df), required=tuple(df.columns))
+    assert parallel == sequential
+    assert parallel["No all-null columns"] == (False, "Completely null columns: ['empty']")
+    assert parallel["Numeric columns ≥2 distinct"][0] is False
+
+
+def test_missing_required_columns():
+    ok, err = _checks(_chunks(_valid_frame()), required=("x", "z", "target", "w"))["Required columns"]
+    assert not ok
+    assert err == "Missing required columns: ['z', 'w']"
+
+
+def test_all_null_column_spanning_chunks():
+    df = _valid_frame().assign(empty=np.nan)
+    ok, err = _checks(_chunks(df))["No all-null columns"]
+    assert not ok
+    assert err == "Completely null columns: ['empty']"
+
+
+def test_column_null_in_some_chunks_is_not_all_null():
+    df = _valid_frame()
+    df.loc[:3, "x"] = np.nan
+    assert _checks(_chunks(df))["No all-null columns"] == (True, "")
+
+
+def test_constant_column_spanning_chunks():
+    df = _valid_frame().assign(y=7)
+    ok, err = _checks(_chunks(df))["Numeric columns ≥2 distinct"]
+    assert not ok
+    assert err == "Numeric columns with < 2 distinct values: ['y']"
+
+
+def test_column_null_in_one_chunk_and_constant_in_the_next():
+    df = _valid_frame().assign(y=[np.nan, np.nan, 3.0, 3.0, 3.0, 3.0])
+    results = _checks(_chunks(df))
+    assert results["No all-null columns"] == (True, "")
+    assert results["Numeric columns ≥2 distinct"] == (False, "Numeric columns with < 2 distinct values: ['y']")
+
+
+def test_min_distinct_above_two_uses_distinct_sets():
+    results = _checks(_chunks(_valid_frame()), min_distinct=3)
+    assert results["Numeric columns ≥2 distinct"] == (False, "Numeric columns with < 3 distinct values: ['y', 'target']")
+
+
+def test_non_binary_target():
+    df = _valid_frame().assign(target=[0, 1, 2, 1, 0, 5])
+    ok, err = _checks(_chunks(df))["Target binary (0/1)"]
+    assert not ok
+    assert err == "Target must be binary (0/1); found values: [2, 5]"
+
+
+def test_string_target():
+    df = _valid_frame().assign(target=["no", "yes", "no", "yes", "no", "yes"])
+    assert _checks(_chunks(df))["Target binary (0/1)"] == (False, "Target has non-numeric values")
+
+
+def test_missing_target():
+    df = _valid_frame().drop(columns=["target"])
+    assert _checks(_chunks(df))["Target binary (0/1)"] == (False, "Target column 'target' not in data")
+
+
+def test_empty_file_yields_schema_and_fails(tmp_path):
+    path = tmp_path / "current.parquet"
+    _valid_frame().iloc[:0].to_parquet(path, index=False)
+    results = _checks(iter_data(path, columns=list(REQUIRED), chunksize=2))
+    assert results["Required columns"] == (True, "")
+    assert results["Target binary (0/1)"] == (False, "Target column is all null")
+    assert results["No all-null columns"] == (False, "Completely null columns: ['x', 'y', 'target']")
+
+
+def test_empty_file_without_required_columns_decodes_no_columns(tmp_path):
+    path = tmp_path / "current.parquet"
+    pd.DataFrame({"other": pd.Series(dtype=float)}).to_parquet(path, index=False)
+    chunks = list(iter_data(path, columns=[], chunksize=2))
+    assert [list(c.columns) for c in chunks] == [[]]
+    assert _checks(chunks)["Required columns"] == (False, "Missing required columns: ['x', 'y', 'target']")
+
+
+@pytest.fixture
+def gate_paths(tmp_path, monkeypatch):
+    """Point the gate at reference/current Parquet files under tmp_path."""
+    reference_path = tmp_path / "reference.parquet"
+    current_path = tmp_path / "current.parquet"
+    monkeypatch.setattr(validate_data, "REFERENCE_PATH", reference_path)
+    monkeypatch.setattr(validate_data, "CURRENT_PATH", current_path)
+    monkeypatch.setattr(validate_data, "CHUNK_ROWS", 2)
+    monkeypatch.delenv("DRIFTGUARD_STRICT", raising=False)
+    validate_data._get_required_columns.cache_clear()
+    yield reference_path, current_path
+    validate_data._get_required_columns.cache_clear()
+
+
+def _run_main(capsys) -> tuple[int, dict]:
+    code = validate_data.main()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    return code, json.loads(lines[0])
+
+
+def test_main_emits_one_json_line_on_pass(gate_paths, capsys):
+    reference_path, current_path = gate_paths
+    _valid_frame().to_parquet(reference_path, index=False)
+    _valid_frame().to_parquet(current_path, index=False)
+
+    code, report = _run_main(capsys)
+    assert code == 0
+    assert report["status"] == "pass"
+    assert report["check"] is None and report["error"] is None
+    assert [r["check"] for r in report["results"]][:2] == ["Required columns", "Target binary (0/1)"]
+    assert all(r["ok"] for r in report["results"])
+    # GE is opt-in: when skipped it is left out rather than reported as passed
+    assert "Great Expectations" not in [r["check"] for r in report["results"]]
+
+
+def test_main_emits_one_json_line_on_failure(gate_paths, capsys):
+    reference_path, current_path = gate_paths
+    _valid_frame().to_parquet(reference_path, index=False)
+    _valid_frame().drop(columns=["y"]).to_parquet(current_path, index=False)
+
+    code, report = _run_main(capsys)
+    assert code == 1
+    assert report["status"] == "fail"
+    assert report["check"] == "Required columns"
+    assert report["error"] == "Missing required columns: ['y']"
+
+
+def test_main_reports_missing_current_file(gate_paths, capsys):
+    code, report = _run_main(capsys)
+    assert code == 1
+    assert report["check"] == "Current file"
+    assert report["results"] == []
+
+
+def test_great_expectations_strict_mode(tmp_path, monkeypatch):
+    pytest.importorskip("great_expectations")
+    monkeypatch.setenv("DRIFTGUARD_STRICT", "1")
+    good = tmp_path / "good.parquet"
+    bad = tmp_path / "bad.parquet"
+    _valid_frame().to_parquet(good, index=False)
+    _valid_frame().assign(target=[0, 1, 2, 1, 0, 1]).to_parquet(bad, index=False)
+    columns = list(REQUIRED)
+
+    assert validate_data._run_great_expectations(good, columns, "target") == (True, "")
+    ok, err = validate_data._run_great_expectations(bad, columns, "target")
+    assert not ok
+    assert err == "Great Expectations failed: ['expect_column_values_to_be_in_set']"
+    # Context and suite are built once and reused across frames
+    assert validate_data._ge_validator_factory.cache_info().hits >= 1